@@ -5,54 +5,228 @@ Handles parsing GitHub URLs and recursive tree downloads via the GitHub API.
 """
 
 import os
-import json
 import re
-import urllib.request
+import hashlib
 import shutil
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import urllib3
+
+from terminal_colors import BLUE, GREEN, YELLOW, RED, BOLD, RESET, DIM
+
+# orjson parses large tree responses several times faster; stdlib json is the fallback
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# Number of concurrent raw file downloads
+MAX_WORKERS = 16
+
+# Buffer size used when streaming response bodies to disk
+CHUNK_SIZE = 64 * 1024
+
+# GitHub URL patterns: .../{owner}/{repo}/(tree|blob)/{branch}/{path} and .../{owner}/{repo}
+_URL_RE = re.compile(r"github\.com/([^/]+)/([^/]+)/(tree|blob)/([^/]+)/(.*)")
+_URL_SIMPLE_RE = re.compile(r"github\.com/([^/]+)/([^/]+)$")
+
+# Where GitHub tree responses and their ETags are cached between runs
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gcode-skill-manager")
+
+# Shared connection pools so api.github.com / raw.githubusercontent.com
+# connections are kept alive across every request of an install.
+# block=True caps open connections per host at MAX_WORKERS; extra
+# requests wait for a free connection instead of opening throwaway ones.
+_POOL_KWARGS = dict(
+    maxsize=MAX_WORKERS,
+    block=True,
+    retries=urllib3.Retry(3, backoff_factor=0.3),
+)
+_DIRECT_POOL = urllib3.PoolManager(**_POOL_KWARGS)
+
+# HTTP(S)_PROXY / NO_PROXY, read once like urllib.request.urlopen's default opener
+_PROXIES = urllib.request.getproxies()
+_PROXY_POOLS = {}
+_PROXY_POOLS_LOCK = threading.Lock()
 
-# Terminal coloring constants
-BLUE = "\033[94m"
-GREEN = "\033[92m"
-YELLOW = "\033[93m"
-RED = "\033[91m"
-BOLD = "\033[1m"
-RESET = "\033[0m"
-DIM = "\033[2m"
+def http_pool(url):
+    """Returns the shared pool for url, honoring the proxy environment variables."""
+    parts = urllib.parse.urlsplit(url)
+    proxy = _PROXIES.get(parts.scheme)
+    if not proxy or urllib.request.proxy_bypass(parts.hostname or ''):
+        return _DIRECT_POOL
+
+    if '://' not in proxy:
+        proxy = 'http://' + proxy
+    with _PROXY_POOLS_LOCK:
+        pool = _PROXY_POOLS.get(proxy)
+        if pool is None:
+            pool = _PROXY_POOLS[proxy] = urllib3.ProxyManager(proxy, **_POOL_KWARGS)
+    return pool
+
+def _git_blob_sha(path):
+    """Computes the git blob SHA-1 of a local file, as reported by the GitHub tree API."""
+    digest = hashlib.sha1(b"blob %d\0" % os.path.getsize(path), usedforsecurity=False)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 class GitHubProvider:
     def __init__(self, user_agent="G-Code-Skill-Manager"):
-        self.headers = {'User-Agent': user_agent}
+        # urllib3 transparently decodes any of the advertised encodings (gzip, deflate, ...)
+        self.headers = {'User-Agent': user_agent, **urllib3.util.make_headers(accept_encoding=True)}
+        self._print_lock = threading.Lock()
 
     def parse_url(self, url):
         """
         Parses a GitHub URL into owner, repo, branch, and path.
         """
-        pattern = r"github\.com/([^/]+)/([^/]+)/(tree|blob)/([^/]+)/(.*)"
-        match = re.search(pattern, url)
+        # Cheap substring test rejects non-GitHub URLs before running either regex
+        if 'github.com/' not in url:
+            return None
+
+        match = _URL_RE.search(url)
         if match:
             owner, repo, _, branch, path = match.groups()
             return owner, repo, branch, path
         
-        pattern_simple = r"github\.com/([^/]+)/([^/]+)$"
-        match_simple = re.search(pattern_simple, url)
+        match_simple = _URL_SIMPLE_RE.search(url)
         if match_simple:
             owner, repo = match_simple.groups()
             return owner, repo, None, ""
             
         return None
 
-    def _get_api_data(self, url):
-        """Helper to fetch JSON from GitHub API."""
-        req = urllib.request.Request(url, headers=self.headers)
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read().decode())
+    def _request(self, url, stream=False, headers=None, allow_not_modified=False):
+        """GETs a URL through the shared pool, raising on non-200 responses."""
+        headers = {**self.headers, **headers} if headers else self.headers
+        response = http_pool(url).request('GET', url, headers=headers, preload_content=not stream)
+        if response.status == 304 and allow_not_modified:
+            return response
+        if response.status != 200:
+            response.drain_conn()
+            raise urllib3.exceptions.HTTPError(f"HTTP {response.status} for {url}")
+        return response
+
+    def _cache_path(self, owner_repo, branch=None):
+        """
+        Returns the (json, etag) cache file paths for a repository tree, or for the
+        repository metadata when branch is None.
+        """
+        # Git ref components can't start with '.', so '.meta' never collides with a branch
+        key = f"{owner_repo}_{branch or '.meta'}".replace('/', '_')
+        base = os.path.join(CACHE_DIR, key)
+        return base + ".json", base + ".etag"
+
+    def _get_api_data(self, url, cache_paths=None, conditional=True):
+        """
+        Helper to fetch JSON from GitHub API.
+        If cache_paths is given, the request is made conditional on the cached
+        ETag and a 304 response is served from the cached body.
+        """
+        headers = None
+        if cache_paths:
+            json_path, etag_path = cache_paths
+        if cache_paths and conditional:
+            try:
+                with open(etag_path, encoding="utf-8") as f:
+                    headers = {'If-None-Match': f.read().strip()}
+            except OSError:
+                pass
+
+        response = self._request(url, headers=headers, allow_not_modified=headers is not None)
+        if response.status == 304:
+            try:
+                with open(json_path, "rb") as f:
+                    return _json.loads(f.read())
+            except (OSError, ValueError):
+                # Cache is unreadable: drop its ETag and refetch unconditionally,
+                # still passing cache_paths so the fresh body is stored again
+                try:
+                    os.remove(etag_path)
+                except OSError:
+                    pass
+                return self._get_api_data(url, cache_paths, conditional=False)
+
+        body = response.data
+        data = _json.loads(body)
+        etag = response.headers.get('ETag')
+        if cache_paths and etag:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(json_path, "wb") as f:
+                    f.write(body)
+                with open(etag_path, "w", encoding="utf-8") as f:
+                    f.write(etag)
+            except OSError:
+                pass
+        return data
 
     def download_file(self, url, dest_path):
-        """Downloads a single file from a URL."""
-        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-        req = urllib.request.Request(url, headers=self.headers)
-        with urllib.request.urlopen(req) as response, open(dest_path, 'wb') as out_file:
-            out_file.write(response.read())
+        """Downloads a single file from a URL. The parent directory of dest_path must exist."""
+        response = self._request(url, stream=True)
+        try:
+            with open(dest_path, 'wb') as out_file:
+                shutil.copyfileobj(response, out_file, CHUNK_SIZE)
+        finally:
+            response.release_conn()
+
+    def _fetch(self, raw_url, rel_path, sha, target_root):
+        """
+        Downloads one skill file into target_root (runs in a worker thread).
+        Returns False if the local copy already matches the blob SHA and was skipped.
+        """
+        # rel_path always comes from the tree listing (relative, no leading slash)
+        dest_path = f"{target_root}{os.sep}{rel_path}"
+        if os.path.isfile(dest_path) and _git_blob_sha(dest_path) == sha:
+            return False
+        with self._print_lock:
+            print(f"  {DIM}📄 Downloading: {rel_path}{RESET}")
+        self.download_file(raw_url, dest_path)
+        return True
+
+    def _prune_stale(self, target_root, keep):
+        """Removes files (and emptied directories) under target_root not listed in keep."""
+        keep = {os.path.normpath(rel_path) for rel_path in keep}
+        for root, dirs, files in os.walk(target_root, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                # Symlinks are never downloaded; writing through one would escape target_root
+                if os.path.islink(path) or os.path.relpath(path, target_root) not in keep:
+                    os.remove(path)
+            for name in dirs:
+                path = os.path.join(root, name)
+                if os.path.islink(path):
+                    os.remove(path)
+                elif os.path.relpath(path, target_root) in keep:
+                    # A directory where the tree now has a file
+                    shutil.rmtree(path)
+                elif not os.listdir(path):
+                    os.rmdir(path)
+
+    def _iter_files(self, tree, actual_path, raw_base):
+        """Yields (raw_url, rel_path, sha) for every blob under actual_path in a tree listing."""
+        # If path is empty (root), we want everything. Otherwise, starts with actual_path/
+        prefix = actual_path + '/' if actual_path else ''
+        for item in tree:
+            if item['type'] != 'blob':
+                continue
+            path = item['path']
+            if path.startswith(prefix):
+                # Tree paths are clean posix paths, so stripping the prefix is enough
+                rel_path = path.removeprefix(prefix)
+            elif path == actual_path:
+                # The URL pointed at a single file
+                rel_path = path.rsplit('/', 1)[-1]
+            else:
+                continue
+            if os.sep != '/':
+                rel_path = rel_path.replace('/', os.sep)
+            yield f"{raw_base}/{path}", rel_path, item['sha']
 
     def install_skill(self, url, target_base_dir):
         """Recursively downloads a GitHub directory using the Recursive Tree API."""
@@ -70,14 +244,23 @@ class GitHubProvider:
         
         print(f"{BLUE}🔍 Fetching structure from {owner_repo}...{RESET}")
         
-        branches_to_try = [branch_hint] if branch_hint else ['main', 'master']
+        if branch_hint:
+            branches_to_try = [branch_hint]
+        else:
+            # One small repo metadata call beats downloading a wrong-branch tree
+            try:
+                meta = self._get_api_data(f"https://api.github.com/repos/{owner_repo}",
+                                          self._cache_path(owner_repo))
+                branches_to_try = [meta['default_branch']]
+            except Exception:
+                branches_to_try = ['main', 'master']
         tree_data = None
         active_branch = None
 
         for branch in branches_to_try:
             api_url = f"https://api.github.com/repos/{owner_repo}/git/trees/{branch}?recursive=1"
             try:
-                tree_data = self._get_api_data(api_url)
+                tree_data = self._get_api_data(api_url, self._cache_path(owner_repo, branch))
                 active_branch = branch
                 break 
             except Exception:
@@ -87,19 +270,23 @@ class GitHubProvider:
             print(f"{RED}✘ Error: Could not fetch repository tree.{RESET}")
             return False
 
+        tree = tree_data['tree']
+
         # Find the actual path in the tree. 
         # Sometimes user provides 'react-best-practices' but it's at 'skills/react-best-practices'
         actual_path = None
         if path_filter:
-            # Try exact match first
-            if any(item['path'] == path_filter for item in tree_data['tree']):
-                actual_path = path_filter
+            # Single pass: an exact match wins, otherwise the first directory ending with it
+            suffix = '/' + path_filter
+            fuzzy_path = None
+            for item in tree:
+                if item['path'] == path_filter:
+                    actual_path = path_filter
+                    break
+                if fuzzy_path is None and item['type'] == 'tree' and item['path'].endswith(suffix):
+                    fuzzy_path = item['path']
             else:
-                # Try fuzzy match (ends with)
-                for item in tree_data['tree']:
-                    if item['type'] == 'tree' and item['path'].endswith('/' + path_filter):
-                        actual_path = item['path']
-                        break
+                actual_path = fuzzy_path
         else:
             actual_path = "" # Root
 
@@ -107,36 +294,51 @@ class GitHubProvider:
             print(f"{RED}✘ Path '{path_filter}' not found in the repository.{RESET}")
             return False
 
-        files_to_download = []
-        for item in tree_data['tree']:
-            # If path is empty (root), we want everything. Otherwise, starts with actual_path/
-            if item['type'] == 'blob':
-                is_match = False
-                if actual_path == "":
-                    is_match = True
-                elif item['path'] == actual_path or item['path'].startswith(actual_path + '/'):
-                    is_match = True
-                
-                if is_match:
-                    rel_path = os.path.relpath(item['path'], actual_path) if actual_path else item['path']
-                    raw_url = f"https://raw.githubusercontent.com/{owner_repo}/{active_branch}/{item['path']}"
-                    files_to_download.append((raw_url, rel_path))
+        raw_base = f"https://raw.githubusercontent.com/{owner_repo}/{active_branch}"
+        files_to_download = list(self._iter_files(tree, actual_path, raw_base))
+        # The parsed tree can be megabytes for large repos; free it before downloading
+        del tree_data, tree
 
         if not files_to_download:
             print(f"{YELLOW}⚠ No files found at {actual_path}{RESET}")
             return False
 
         target_root = os.path.join(target_base_dir, skill_name)
+        if os.path.islink(target_root):
+            # Pruning or downloading through a linked skill would touch files outside the skills dir
+            print(f"{RED}✘ Failed to install: {target_root} is a symbolic link, remove it first.{RESET}")
+            return False
+
         try:
-            if os.path.exists(target_root):
-                shutil.rmtree(target_root)
+            # Keep an existing install so unchanged files can be skipped,
+            # but drop whatever the tree no longer contains
+            if os.path.isdir(target_root):
+                self._prune_stale(target_root, (rel_path for _, rel_path, _ in files_to_download))
+            elif os.path.exists(target_root):
+                os.remove(target_root)
             os.makedirs(target_root, exist_ok=True)
 
-            for raw_url, rel_path in files_to_download:
-                dest_path = os.path.join(target_root, rel_path)
-                print(f"  {DIM}📄 Downloading: {rel_path}{RESET}")
-                self.download_file(raw_url, dest_path)
+            # Create each parent directory once, up front, so workers don't race on them
+            root_prefix = target_root + os.sep
+            parent_dirs = {os.path.dirname(root_prefix + rel_path)
+                           for _, rel_path, _ in files_to_download}
+            for parent_dir in parent_dirs:
+                os.makedirs(parent_dir, exist_ok=True)
+
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = [executor.submit(self._fetch, *f, target_root) for f in files_to_download]
+                downloaded = 0
+                for future in as_completed(futures):
+                    try:
+                        downloaded += future.result()
+                    except Exception:
+                        # Fail fast: drop queued downloads instead of waiting them out
+                        executor.shutdown(cancel_futures=True)
+                        raise
                 
+            unchanged = len(files_to_download) - downloaded
+            if unchanged:
+                print(f"  {DIM}✔ {unchanged} file(s) already up to date{RESET}")
             print(f"{GREEN}✔ Successfully installed: {BOLD}{skill_name}{RESET}")
             return True
         except Exception as e:
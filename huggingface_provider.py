@@ -5,22 +5,22 @@ Handles downloading SKILL.md files from Hugging Face Spaces.
 """
 
 import os
-import json
 import re
-import urllib.request
+import shutil
 
-# Terminal coloring constants
-BLUE = "\033[94m"
-GREEN = "\033[92m"
-YELLOW = "\033[93m"
-RED = "\033[91m"
-BOLD = "\033[1m"
-RESET = "\033[0m"
-DIM = "\033[2m"
+import urllib3
+
+from github_provider import http_pool, CHUNK_SIZE
+from terminal_colors import BLUE, GREEN, RED, BOLD, RESET
+
+# Spaces URL, SKILL.md frontmatter block and its install-name field
+_HF_RE = re.compile(r"/spaces/([^/]+)/([^/]+)")
+_FM_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+_NAME_RE = re.compile(r"install-name:\s*['\"]?([^'\"\n]+)['\"]?")
 
 class HuggingFaceProvider:
     def __init__(self, user_agent="G-Code-Skill-Manager"):
-        self.headers = {'User-Agent': user_agent}
+        self.headers = {'User-Agent': user_agent, **urllib3.util.make_headers(accept_encoding=True)}
         self.host = 'huggingface.co'
 
     def parse_url(self, url):
@@ -42,7 +42,7 @@ class HuggingFaceProvider:
                 return None
 
             # Match: /spaces/{owner}/{repo}/
-            match = re.search(r"/spaces/([^/]+)/([^/]+)", url)
+            match = _HF_RE.search(url)
             if match:
                 return {
                     "owner": match.group(1),
@@ -64,11 +64,15 @@ class HuggingFaceProvider:
     def download_file(self, url):
         """Fetches the content of the SKILL.md file."""
         raw_url = self.to_raw_url(url)
-        req = urllib.request.Request(raw_url, headers=self.headers)
-        with urllib.request.urlopen(req, timeout=30) as response:
+        response = http_pool(raw_url).request('GET', raw_url, headers=self.headers, timeout=30,
+                                              preload_content=False)
+        try:
             if response.status != 200:
+                response.drain_conn()
                 return None
-            return response.read().decode('utf-8')
+            return b''.join(response.stream(CHUNK_SIZE)).decode('utf-8')
+        finally:
+            response.release_conn()
 
     def install_skill(self, url, target_base_dir):
         """Downloads the SKILL.md and installs it based on repo metadata."""
@@ -85,23 +89,18 @@ class HuggingFaceProvider:
                 print(f"{RED}✘ Failed to fetch content from {url}{RESET}")
                 return False
 
-            # Basic YAML frontmatter extraction (simulating 'matter' library)
+            # Basic YAML frontmatter extraction (simulating 'matter' library),
+            # a regex is enough for the single install-name field we need
             install_name = parsed['repo']
-            fm_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+            fm_match = _FM_RE.match(content)
             if fm_match:
-                import yaml # Assuming yaml is available or use simple regex
-                try:
-                    # Simple regex fallback if yaml isn't installed for metadata parsing
-                    name_match = re.search(r"install-name:\s*['\"]?([^'\"\n]+)['\"]?", fm_match.group(1))
-                    if name_match:
-                        install_name = name_match.group(1)
-                except Exception:
-                    pass
+                name_match = _NAME_RE.search(fm_match.group(1))
+                if name_match:
+                    install_name = name_match.group(1)
 
             target_root = os.path.join(target_base_dir, install_name)
             
             if os.path.exists(target_root):
-                import shutil
                 shutil.rmtree(target_root)
             os.makedirs(target_root, exist_ok=True)
 
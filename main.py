@@ -8,9 +8,18 @@ import os
 import sys
 import argparse
 import shutil
-from github_provider import GitHubProvider, BLUE, GREEN, YELLOW, RED, BOLD, RESET, DIM
+from concurrent.futures import ThreadPoolExecutor
+from github_provider import GitHubProvider
+from terminal_colors import BLUE, GREEN, YELLOW, RED, BOLD, RESET, DIM
 from huggingface_provider import HuggingFaceProvider
 
+# Cached structure.md section kept inside each skill folder
+FRAGMENT_NAME = ".structure_fragment.md"
+
+# VCS, cache and dependency folders (and our own fragment) are never part of a skill
+_IGNORE = shutil.ignore_patterns('.git', '__pycache__', 'node_modules', '.venv', '*.pyc', '.DS_Store',
+                                 FRAGMENT_NAME)
+
 def get_skills_dir():
     """Determine the skills directory relative to the current working directory."""
     return os.path.join(os.getcwd(), ".gcode", "skills")
@@ -23,12 +32,51 @@ def ensure_skills_dir():
         print(f"{GREEN}✔ Created skills directory at: {skills_dir}{RESET}")
     return skills_dir
 
-def update_structure_md():
-    """Generates a structure.md file for the G-Code agent to navigate skills."""
-    skills_dir = get_skills_dir()
-    if not os.path.exists(skills_dir):
-        return
+def _regenerate_skill_fragment(skill):
+    """Writes (and returns) the structure.md section for a single installed skill."""
+    skill_path = os.path.join(get_skills_dir(), skill)
+    content = [
+        f"## 📁 {skill}",
+        f"Root Path: `.gcode/skills/{skill}/`",
+        "### File Tree:"
+    ]
+
+    # Iterative DFS with os.scandir; dirent types avoid a stat per entry
+    stack = [(skill_path, 0)]
+    while stack:
+        path, level = stack.pop()
+        if level:
+            content.append(f"{'  ' * level}  📁 {os.path.basename(path)}/")
+
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        ignored = _IGNORE(path, [e.name for e in entries])
+        
+        file_indent = '  ' * (level + 1)
+        sub_dirs = []
+        for entry in entries:
+            if entry.name in ignored:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                sub_dirs.append((entry.path, level + 1))
+            else:
+                content.append(f"{file_indent}📄 {entry.name}")
+        # Reversed so the stack pops subdirectories in sorted order
+        stack.extend(reversed(sub_dirs))
+    content.append("\n---\n")
 
+    fragment = "\n".join(content)
+    try:
+        with open(os.path.join(skill_path, FRAGMENT_NAME), "w", encoding="utf-8") as f:
+            f.write(fragment)
+    except OSError:
+        # e.g. a read-only skill folder; structure.md still works without the cache
+        pass
+    return fragment
+
+def _assemble_structure_md():
+    """Concatenates the cached per-skill fragments into structure.md."""
+    skills_dir = get_skills_dir()
     structure_file = os.path.join(skills_dir, "structure.md")
     content = [
         "# G-Code Skills Structure\n",
@@ -37,36 +85,58 @@ def update_structure_md():
     ]
 
     # Get all subdirectories (each is a skill)
+    skills_dir_sep = skills_dir + os.sep
     items = sorted([d for d in os.listdir(skills_dir) 
-                   if os.path.isdir(os.path.join(skills_dir, d)) and not d.startswith('.')])
+                   if os.path.isdir(skills_dir_sep + d) and not d.startswith('.')])
     
     if not items:
         content.append("No skills currently installed.")
     else:
         for skill in items:
-            content.append(f"## 📁 {skill}")
-            content.append(f"Root Path: `.gcode/skills/{skill}/`")
-            content.append("### File Tree:")
-            
-            skill_path = os.path.join(skills_dir, skill)
-            for root, dirs, files in os.walk(skill_path):
-                # Indentation based on folder depth
-                level = root.replace(skill_path, '').count(os.sep)
-                indent = '  ' * level
-                
-                sub_dir = os.path.basename(root)
-                if sub_dir != skill:
-                    content.append(f"{indent}  📁 {sub_dir}/")
-                
-                file_indent = '  ' * (level + 1)
-                for f in sorted(files):
-                    content.append(f"{file_indent}📄 {f}")
-            content.append("\n---\n")
+            try:
+                with open(f"{skills_dir_sep}{skill}{os.sep}{FRAGMENT_NAME}", encoding="utf-8") as f:
+                    content.append(f.read())
+            except OSError:
+                content.append(_regenerate_skill_fragment(skill))
 
     with open(structure_file, "w", encoding="utf-8") as f:
         f.write("\n".join(content))
+
+def update_structure_md():
+    """
+    Generates a structure.md file for the G-Code agent to navigate skills.
+    Only skills without a cached fragment are walked; installing a skill always
+    rewrites its folder without one, and removing it drops the folder entirely.
+    """
+    if not os.path.exists(get_skills_dir()):
+        return
+
+    _assemble_structure_md()
     print(f"{DIM}⚙ Updated structure.md{RESET}")
 
+def _parallel_copytree(src, dst, workers=8):
+    """Copies a directory tree, creating directories first and copying files in parallel."""
+    pairs = []
+    stack = [(src, dst)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            entries = list(it)
+        ignored = _IGNORE(src_dir, [e.name for e in entries])
+        for entry in entries:
+            if entry.name in ignored:
+                continue
+            target = os.path.join(dst_dir, entry.name)
+            if entry.is_dir():
+                stack.append((entry.path, target))
+            else:
+                pairs.append((entry.path, target))
+
+    # shutil.copy2 already uses os.sendfile (in-kernel copy) on Linux
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda p: shutil.copy2(*p), pairs))
+
 def add_local_skill(source_path):
     """Copies a local file or directory into the skills directory."""
     skills_dir = ensure_skills_dir()
@@ -80,7 +150,7 @@ def add_local_skill(source_path):
     try:
         if os.path.isdir(source_path):
             if os.path.exists(dest_path): shutil.rmtree(dest_path)
-            shutil.copytree(source_path, dest_path)
+            _parallel_copytree(source_path, dest_path)
         else:
             os.makedirs(os.path.dirname(dest_path), exist_ok=True)
             shutil.copy2(source_path, dest_path)
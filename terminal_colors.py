@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Terminal colors for G-Code Skill Manager
+ANSI codes are disabled when stdout is not a TTY or NO_COLOR is set.
+"""
+
+import os
+import sys
+
+_ENABLED = bool(sys.stdout and sys.stdout.isatty()) and not os.environ.get("NO_COLOR")
+
+# Terminal coloring constants
+BLUE = "\033[94m" if _ENABLED else ""
+GREEN = "\033[92m" if _ENABLED else ""
+YELLOW = "\033[93m" if _ENABLED else ""
+RED = "\033[91m" if _ENABLED else ""
+BOLD = "\033[1m" if _ENABLED else ""
+RESET = "\033[0m" if _ENABLED else ""
+DIM = "\033[2m" if _ENABLED else ""